@@ -15,7 +15,8 @@ PROCESS OVERVIEW:
    - Only proceeds after nodetool-core is successfully published
 
 2. Phase 2 - Remaining repositories:
-   - For each repository in REPOS (excluding nodetool-core):
+   - For each repository in REPOS (excluding nodetool-core), processed
+     concurrently (up to MAX_PARALLEL_REPOS at a time):
      * Updates version files if --update-versions is enabled:
        - pyproject.toml: version field and nodetool-core dependency pinning
        - .github/workflows/copilot-setup-steps.yml: NODETOOL_CORE_REF
@@ -26,12 +27,18 @@ PROCESS OVERVIEW:
        - electron/package.json: version field
        - web/src/config/constants.ts: VERSION constant
      * Commits changes with message "Bump version to <version>"
-     * Pushes commit to main branch
-     * Creates and pushes git tag
+     * Creates git tag and pushes it together with the commit to main
+       in a single atomic push
+   - Git operations within one repository stay sequential, but because each
+     repository runs on its own worker, local work (`nodetool package scan`,
+     `uv lock`) in one repository overlaps network-bound pushes in others
 
 3. Workflow Monitoring:
-   - Polls GitHub Actions for release workflows (Build and Publish Wheel, Release)
-   - Waits up to 30 minutes (MAX_WAIT) with 30-second intervals (POLL_INTERVAL)
+   - Polls GitHub Actions for release workflows (Build and Publish Wheel, Release),
+     querying all repositories at once through the GraphQL API, until each
+     repository's run has started (30-second intervals, POLL_INTERVAL)
+   - Watches all runs concurrently with `gh run watch` (refreshing every
+     POLL_INTERVAL), up to 30 minutes (MAX_WAIT)
    - Displays workflow logs if any release fails
    - Exits with error if any workflow fails or is cancelled
 
@@ -115,9 +122,11 @@ import os
 import re
 import subprocess
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple, Union
 
 # Colors for output
 RED = "\033[0;31m"
@@ -125,17 +134,53 @@ GREEN = "\033[0;32m"
 YELLOW = "\033[1;33m"
 NC = "\033[0m"  # No Color
 
+# Patterns used by the version file updaters
+_RE_PYPROJECT_VERSION = re.compile(r'^(\s*)version = "[^"]+"', re.MULTILINE)
+_RE_CORE_DEP = re.compile(r'"nodetool-core[^"]*"')
+_RE_NAME_FIELD = re.compile(r"\s*name\s*=")
+_RE_COPILOT_REF = re.compile(r"^(\s*NODETOOL_CORE_REF:\s*)(\S+)(\s*)$", re.MULTILINE)
+_RE_GIT_PKG = re.compile(
+    r"(git\+https://github\.com/nodetool-ai/[^\s\"']+?\.git@)([^\s\"'\\]+)"
+)
+_RE_DOCKER_PYPI = re.compile(r"(nodetool-[a-z-]+)==([0-9]+\.[0-9]+\.[0-9]+[^\s\"]*)")
+# Top-level "version" key of a package.json (2-space or tab indented)
+_RE_PACKAGE_JSON_VERSION = re.compile(
+    r'^((?:  |\t)"version"\s*:\s*")[^"]*(")', re.MULTILINE
+)
+_RE_VERSION_CONST = re.compile(r'(export const VERSION = ")[^"]+(")')
+
+# Repositories are processed concurrently, so serialize writes to stdout to
+# keep log lines from interleaving.
+_print_lock = threading.RLock()
+
+
+def _print(msg, buffer: Optional[List[str]] = None):
+    """Print a line, or append it to `buffer` to be emitted later as one block."""
+    if buffer is not None:
+        buffer.append(f"{msg}\n")
+        return
+    with _print_lock:
+        print(msg, flush=True)
+
+
+def flush_buffer(buffer: List[str]):
+    """Write buffered lines to stdout in a single call."""
+    with _print_lock:
+        sys.stdout.write("".join(buffer))
+        sys.stdout.flush()
+    buffer.clear()
 
-def print_info(msg):
-    print(f"{GREEN}[INFO]{NC} {msg}")
 
+def print_info(msg, buffer: Optional[List[str]] = None):
+    _print(f"{GREEN}[INFO]{NC} {msg}", buffer)
 
-def print_error(msg):
-    print(f"{RED}[ERROR]{NC} {msg}")
 
+def print_error(msg, buffer: Optional[List[str]] = None):
+    _print(f"{RED}[ERROR]{NC} {msg}", buffer)
 
-def print_warning(msg):
-    print(f"{YELLOW}[WARNING]{NC} {msg}")
+
+def print_warning(msg, buffer: Optional[List[str]] = None):
+    _print(f"{YELLOW}[WARNING]{NC} {msg}", buffer)
 
 
 def setup_git_auth(repo_path: Path) -> bool:
@@ -196,7 +241,8 @@ def setup_git_auth(repo_path: Path) -> bool:
 
 def print_git_diagnostics(repo_path: Path):
     """Print diagnostic information about git configuration"""
-    print_info(f"\n=== Git Diagnostics for {repo_path} ===")
+    lines: List[str] = []
+    print_info(f"\n=== Git Diagnostics for {repo_path} ===", lines)
 
     # Check git user config
     for cmd, desc in [
@@ -209,13 +255,13 @@ def print_git_diagnostics(repo_path: Path):
         result = run_command(cmd, cwd=repo_path, check=False, capture_output=True)
         if result.returncode == 0:
             output = result.stdout.strip() if result.stdout else "(empty)"
-            print_info(f"  {desc}: {output}")
+            print_info(f"  {desc}: {output}", lines)
         else:
-            print_warning(f"  {desc}: Failed to get")
+            print_warning(f"  {desc}: Failed to get", lines)
 
     # Check if we're in a git repo
     is_git_repo = (repo_path / ".git").is_dir()
-    print_info(f"  Is git repository: {is_git_repo}")
+    print_info(f"  Is git repository: {is_git_repo}", lines)
 
     # Check environment variables
     for var in ["GH_PAT", "GITHUB_TOKEN", "GIT_AUTHOR_NAME", "GIT_AUTHOR_EMAIL"]:
@@ -224,13 +270,14 @@ def print_git_diagnostics(repo_path: Path):
             # Mask token values
             if "TOKEN" in var or "PAT" in var:
                 masked = val[:4] + "..." + val[-4:] if len(val) > 8 else "***"
-                print_info(f"  {var}: {masked}")
+                print_info(f"  {var}: {masked}", lines)
             else:
-                print_info(f"  {var}: {val}")
+                print_info(f"  {var}: {val}", lines)
         else:
-            print_warning(f"  {var}: not set")
+            print_warning(f"  {var}: not set", lines)
 
-    print_info("=== End Diagnostics ===\n")
+    print_info("=== End Diagnostics ===\n", lines)
+    flush_buffer(lines)
 
 
 REPOS = [
@@ -250,192 +297,250 @@ def run_command(
     check=True,
     capture_output=True,
     env: Optional[dict] = None,
+    timeout: Optional[float] = None,
 ) -> subprocess.CompletedProcess:
     try:
         # Log command for diagnostics
         print_info(f"Running: {' '.join(cmd)} (cwd={cwd})")
         result = subprocess.run(
-            cmd, cwd=cwd, check=check, capture_output=capture_output, text=True, env=env
+            cmd,
+            cwd=cwd,
+            check=check,
+            capture_output=capture_output,
+            text=True,
+            env=env,
+            timeout=timeout,
         )
         if result.returncode != 0 and not check:
             print_warning(f"Command returned {result.returncode}")
             if result.stdout:
-                print(f"stdout: {result.stdout}")
+                _print(f"stdout: {result.stdout}")
             if result.stderr:
-                print(f"stderr: {result.stderr}")
+                _print(f"stderr: {result.stderr}")
         return result
     except subprocess.CalledProcessError as e:
         if check:
             print_error(f"Command failed: {' '.join(cmd)}")
             print_error(f"Exit code: {e.returncode}")
             if e.stdout:
-                print(f"stdout: {e.stdout}")
+                _print(f"stdout: {e.stdout}")
             if e.stderr:
-                print(f"stderr: {e.stderr}")
+                _print(f"stderr: {e.stderr}")
             raise
         return e
 
 
-def update_nodetool_core_dependency(file_path: Path, version: str) -> bool:
-    if not file_path.exists():
+# A transform maps file content to its updated content
+Transform = Callable[[str], str]
+
+
+def apply_file_transforms(
+    file_path: Path, transforms: List[Transform], assume_exists: bool = False
+) -> bool:
+    """
+    Apply a sequence of text transforms to a file with a single read and at
+    most one write. Returns True if the file content changed.
+    """
+    if not assume_exists and not file_path.exists():
         return False
 
     text = file_path.read_text()
-    if "nodetool-core" not in text:
+    new_text = text
+    for transform in transforms:
+        new_text = transform(new_text)
+
+    if new_text == text:
         return False
+    file_path.write_text(new_text)
+    return True
 
-    pattern = re.compile(r'"nodetool-core[^"]*"')
-    updated = False
 
-    def replacement(match):
-        nonlocal updated
-        start = match.start()
-        line_start = text.rfind("\n", 0, start) + 1
-        line_end = text.find("\n", match.end())
-        if line_end == -1:
-            line_end = len(text)
+def regex_transform(
+    pattern: re.Pattern, repl: Union[str, Callable[[re.Match], str]]
+) -> Transform:
+    return lambda text: pattern.sub(repl, text)
 
-        line = text[line_start:line_end]
-        if re.search(r"^\s*name\s*=", line):
-            return match.group(0)
 
-        updated = True
-        return f'"nodetool-core=={version}"'
+def pyproject_version_transform(version: str) -> Transform:
+    return regex_transform(_RE_PYPROJECT_VERSION, rf'\g<1>version = "{version}"')
 
-    new_text = pattern.sub(replacement, text)
 
-    if updated and new_text != text:
-        file_path.write_text(new_text)
-        print_info(
-            f"  Pinned nodetool-core dependencies to {version} in {file_path.name}"
+def nodetool_core_dependency_transform(version: str) -> Transform:
+    pinned = f'"nodetool-core=={version}"'
+
+    def transform(text: str) -> str:
+        # Skip the regex pass when every reference is already pinned
+        if text.count('"nodetool-core') == text.count(pinned):
+            return text
+        return "".join(
+            # Leave the package's own `name = "nodetool-core"` untouched
+            line if _RE_NAME_FIELD.match(line) else _RE_CORE_DEP.sub(pinned, line)
+            for line in text.splitlines(keepends=True)
         )
-        return True
-    return False
 
+    return transform
+
+
+def git_package_refs_transform(version_tag: str) -> Transform:
+    return regex_transform(_RE_GIT_PKG, rf"\g<1>{version_tag}")
 
-def update_package_json_version(file_path: Path, version: str) -> bool:
+
+def dockerfile_pypi_versions_transform(version: str) -> Transform:
+    return regex_transform(_RE_DOCKER_PYPI, rf"\g<1>=={version}")
+
+
+def update_pyproject(
+    file_path: Path, version: str, assume_exists: bool = False
+) -> Optional[Path]:
+    if not assume_exists and not file_path.exists():
+        return None
+
+    print_info(f"  Updating version in {file_path.name}...")
+    if apply_file_transforms(
+        file_path,
+        [
+            pyproject_version_transform(version),
+            nodetool_core_dependency_transform(version),
+        ],
+        assume_exists=True,
+    ):
+        print_info(
+            f"  Updated {file_path.name} (version and nodetool-core pins to {version})"
+        )
+        return file_path
+    return None
+
+
+def update_dockerfile(
+    file_path: Path, version: str, version_tag: str, assume_exists: bool = False
+) -> Optional[Path]:
+    if apply_file_transforms(
+        file_path,
+        [
+            git_package_refs_transform(version_tag),
+            dockerfile_pypi_versions_transform(version),
+        ],
+        assume_exists=assume_exists,
+    ):
+        print_info(f"  Updated git package refs and PyPI versions in {file_path}")
+        return file_path
+    return None
+
+
+def update_package_json_version(file_path: Path, version: str) -> Optional[Path]:
     if not file_path.exists():
-        return False
+        return None
+
+    # Rewrite only the version line so the rest of the file keeps its formatting
+    text = file_path.read_text()
+    new_text, count = _RE_PACKAGE_JSON_VERSION.subn(
+        rf"\g<1>{version}\g<2>", text, count=1
+    )
+    if count > 0:
+        if new_text == text:
+            return None
+        file_path.write_text(new_text)
+        print_info(f"  Updated version in {file_path}")
+        return file_path
 
     try:
-        data = json.loads(file_path.read_text())
+        data = json.loads(text)
         if data.get("version") == version:
-            return False
+            return None
 
         data["version"] = version
         file_path.write_text(json.dumps(data, indent=2) + "\n")
         print_info(f"  Updated version in {file_path}")
-        return True
+        return file_path
     except json.JSONDecodeError:
         print_warning(f"  Could not parse JSON in {file_path}")
-        return False
+        return None
 
 
-def update_constants_version(file_path: Path, version: str) -> bool:
+def update_constants_version(file_path: Path, version: str) -> Optional[Path]:
     if not file_path.exists():
-        return False
+        return None
 
     text = file_path.read_text()
-    pattern = r'(export const VERSION = ")[^"]+(")'
-    new_text, count = re.subn(pattern, f"\g<1>{version}\g<2>", text, count=1)
+    new_text, count = _RE_VERSION_CONST.subn(rf"\g<1>{version}\g<2>", text, count=1)
 
     if count > 0 and new_text != text:
         file_path.write_text(new_text)
         print_info(f"  Updated VERSION constant in {file_path}")
-        return True
-    return False
-
-
-def update_pyproject_version(file_path: Path, version: str) -> bool:
-    if not file_path.exists():
-        return False
-
-    print_info(f"  Updating version in {file_path.name}...")
-    text = file_path.read_text()
-    pattern = re.compile(r'^(\s*)version = "[^"]+"', re.MULTILINE)
-
-    new_text, count = pattern.subn(f'\g<1>version = "{version}"', text)
-
-    if count > 0:
-        file_path.write_text(new_text)
-        print_info(f"  Updated {file_path.name}")
-        return True
-    return False
+        return file_path
+    return None
 
 
-def update_copilot_core_ref(file_path: Path, version_tag: str) -> bool:
-    if not file_path.exists():
-        return False
+def update_copilot_core_ref(
+    file_path: Path, version_tag: str, assume_exists: bool = False
+) -> Optional[Path]:
+    if not assume_exists and not file_path.exists():
+        return None
 
     text = file_path.read_text()
-    pattern = re.compile(r"^(\s*NODETOOL_CORE_REF:\s*)(\S+)(\s*)$", re.MULTILINE)
-    new_text, count = pattern.subn(rf"\1{version_tag}\3", text)
+    new_text, count = _RE_COPILOT_REF.subn(rf"\1{version_tag}\3", text)
 
     if count > 0 and new_text != text:
         file_path.write_text(new_text)
         print_info(f"  Updated NODETOOL_CORE_REF in {file_path}")
-        return True
-    return False
+        return file_path
+    return None
 
 
-def update_git_package_refs(file_path: Path, version_tag: str) -> bool:
-    if not file_path.exists():
-        return False
+def find_version_files(
+    repo_path: Path, include_untracked: bool = False
+) -> Tuple[List[Path], List[Path]]:
+    """
+    Find Dockerfiles and package_metadata directories from git's index
+    rather than walking the working tree, so build outputs, virtualenvs and
+    node_modules are never visited. Returns (dockerfiles, metadata_dirs).
+    """
+    cmd = ["git", "ls-files", "-z", "--cached"]
+    if include_untracked:
+        cmd += ["--others", "--exclude-standard"]
+    result = run_command(cmd, cwd=repo_path, check=False)
+    if result.returncode != 0:
+        return [], []
+
+    dockerfiles = set()
+    metadata_dirs = set()
+    for rel_path in result.stdout.split("\0"):
+        if not rel_path:
+            continue
+        path = Path(rel_path)
+        if path.name.startswith("Dockerfile"):
+            dockerfiles.add(repo_path / path)
+        if path.parent.name == "package_metadata":
+            metadata_dirs.add(repo_path / path.parent)
+    return sorted(dockerfiles), sorted(metadata_dirs)
+
+
+def changed_metadata_files(repo_path: Path, metadata_dirs: List[Path]) -> List[Path]:
+    """Ask git which metadata JSON files a package scan added or modified"""
+    if not metadata_dirs:
+        return []
 
-    text = file_path.read_text()
-    pattern = re.compile(
-        r"(git\+https://github\.com/nodetool-ai/[^\s\"']+?\.git@)([^\s\"'\\]+)"
+    result = run_command(
+        ["git", "status", "--porcelain", "-z", "--untracked-files=all", "--"]
+        + [str(d.relative_to(repo_path)) for d in metadata_dirs],
+        cwd=repo_path,
+        check=False,
     )
-    new_text, count = pattern.subn(rf"\1{version_tag}", text)
-
-    if count > 0 and new_text != text:
-        file_path.write_text(new_text)
-        print_info(f"  Updated git package refs in {file_path}")
-        return True
-    return False
-
-
-def update_dockerfile_pypi_versions(file_path: Path, version: str) -> bool:
-    if not file_path.exists():
-        return False
-
-    text = file_path.read_text()
-    updated = False
-
-    pattern = re.compile(r"(nodetool-[a-z-]+)==([0-9]+\.[0-9]+\.[0-9]+[^\s\"]*)")
-    new_text, count = pattern.subn(rf"\1=={version}", text)
-    if count > 0 and new_text != text:
-        text = new_text
-        updated = True
-
-    if updated and text != file_path.read_text():
-        file_path.write_text(text)
-        print_info(f"  Updated PyPI package versions in {file_path}")
-        return True
-    return False
-
-
-def find_dockerfiles(repo_path: Path) -> List[Path]:
-    return [
-        path
-        for path in repo_path.rglob("Dockerfile*")
-        if path.is_file()
-        and ".venv" not in path.parts
-        and "node_modules" not in path.parts
-    ]
-
-
-def find_metadata_dirs(repo_path: Path) -> List[Path]:
-    found = []
-    for path in repo_path.rglob("package_metadata"):
-        if (
-            path.is_dir()
-            and ".git" not in path.parts
-            and ".venv" not in path.parts
-            and "node_modules" not in path.parts
-        ):
-            found.append(path)
-    return found
+    if result.returncode != 0:
+        return []
+
+    changed = []
+    entries = iter(result.stdout.split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        status, path = entry[:2], entry[3:]
+        if "R" in status or "C" in status:
+            # Renames and copies are followed by the original path
+            next(entries, None)
+        if path.endswith(".json"):
+            changed.append(repo_path / path)
+    return changed
 
 
 def run_package_scan(repo_path: Path) -> bool:
@@ -475,77 +580,153 @@ def generate_uv_lock(repo_path: Path) -> bool:
         print_warning(f"  Failed to generate uv.lock in {repo_path.name}")
         if result.stderr:
             for line in result.stderr.strip().split("\n")[:5]:
-                print(f"    {line}")
+                _print(f"    {line}")
     return False
 
 
-def get_release_run(repo_path: Path, tag: str) -> tuple[Optional[dict], bool]:
-    cmd = [
-        "gh",
-        "run",
-        "list",
-        "--limit",
-        "20",
-        "--json",
-        "databaseId,status,conclusion,headBranch,headSha,event,workflowName",
-    ]
-    try:
-        proc = run_command(cmd, cwd=repo_path, check=True)
-        runs = json.loads(proc.stdout)
-    except (json.JSONDecodeError, subprocess.CalledProcessError):
-        return None, False
+GITHUB_OWNER = "nodetool-ai"
+RELEASE_WORKFLOWS = ["Build and Publish Wheel", "Release"]
 
-    RELEASE_WORKFLOWS = ["Build and Publish Wheel", "Release"]
+RELEASE_RUNS_QUERY_FRAGMENT = """
+fragment ReleaseCommit on Commit {
+  checkSuites(last: 20) {
+    nodes {
+      status
+      conclusion
+      workflowRun { databaseId createdAt workflow { name } }
+    }
+  }
+}
+"""
 
-    for run in runs:
-        branch = run.get("headBranch", "")
-        workflow_name = run.get("workflowName", "")
 
-        if branch == tag:
-            if workflow_name in RELEASE_WORKFLOWS:
-                return run, True
+def get_release_runs_batch(
+    repos: List[str], tag: str, cwd: Path, exclude_ids: Optional[set] = None
+) -> dict[str, Optional[dict]]:
+    """
+    Fetch the newest release workflow run on each repository's tagged commit
+    with a single GraphQL query instead of one `gh run list` per repository.
 
-    return None, True
+    The run is found through the commit, so it may belong to an earlier tag on
+    the same commit; callers must confirm it with `view_release_run` and pass
+    rejected run ids back in `exclude_ids`.
 
+    Returns a mapping of repo -> candidate run (or None if the tagged commit has
+    no other release run). Repositories whose tag could not be resolved, or all
+    of them if the query fails, are left out so the caller can fall back to
+    per-repo checks.
+    """
+    exclude_ids = exclude_ids or set()
+    if not repos:
+        return {}
+
+    aliases = {f"r{i}": repo for i, repo in enumerate(repos)}
+    selections = "\n".join(
+        f"  {alias}: repository(owner: {json.dumps(GITHUB_OWNER)}, name: {json.dumps(repo)}) {{\n"
+        f"    ref(qualifiedName: {json.dumps(f'refs/tags/{tag}')}) {{\n"
+        "      target { ...ReleaseCommit ... on Tag { target { ...ReleaseCommit } } }\n"
+        "    }\n"
+        "  }"
+        for alias, repo in aliases.items()
+    )
+    query = f"query {{\n{selections}\n}}\n{RELEASE_RUNS_QUERY_FRAGMENT}"
 
-def print_workflow_logs(repo_path: Path, tag: str) -> None:
-    run, ok = get_release_run(repo_path, tag)
-    if not ok:
-        print_warning("  Could not fetch workflow logs (gh run list failed)")
-        return
+    proc = run_command(
+        ["gh", "api", "graphql", "-f", f"query={query}"], cwd=cwd, check=False
+    )
+    if proc.returncode != 0:
+        return {}
+    try:
+        data = json.loads(proc.stdout).get("data") or {}
+    except json.JSONDecodeError:
+        return {}
+
+    runs: dict[str, Optional[dict]] = {}
+    for alias, repo in aliases.items():
+        ref = (data.get(alias) or {}).get("ref")
+        if not ref:
+            continue
+        target = ref.get("target") or {}
+        commit = target.get("target") or target
+        suites = (commit.get("checkSuites") or {}).get("nodes") or []
+
+        latest = None
+        for suite in suites:
+            workflow_run = suite.get("workflowRun") or {}
+            workflow_name = (workflow_run.get("workflow") or {}).get("name", "")
+            if workflow_name not in RELEASE_WORKFLOWS:
+                continue
+            if workflow_run.get("databaseId") in exclude_ids:
+                continue
+            if latest is None or workflow_run.get("createdAt", "") >= latest[0]:
+                latest = (
+                    workflow_run.get("createdAt", ""),
+                    {
+                        "databaseId": workflow_run.get("databaseId"),
+                        "status": (suite.get("status") or "").lower(),
+                        "conclusion": (suite.get("conclusion") or "").lower(),
+                        "workflowName": workflow_name,
+                    },
+                )
+        runs[repo] = latest[1] if latest else None
+
+    return runs
+
+
+def view_release_run(repo: str, repo_path: Path, run_id) -> Optional[dict]:
+    """Fetch a workflow run's current state (None if gh fails)."""
+    proc = run_command(
+        [
+            "gh",
+            "run",
+            "view",
+            str(run_id),
+            "--repo",
+            f"{GITHUB_OWNER}/{repo}",
+            "--json",
+            "databaseId,headBranch,status,conclusion,workflowName",
+        ],
+        cwd=repo_path,
+        check=False,
+    )
+    if proc.returncode != 0:
+        return None
+    try:
+        return json.loads(proc.stdout)
+    except json.JSONDecodeError:
+        return None
+
+
+def print_workflow_logs(repo_path: Path, run: Optional[dict]) -> None:
     if not run or not run.get("databaseId"):
         print_warning("  Could not find workflow run to fetch logs")
         return
 
     run_id = str(run["databaseId"])
     print_info(f"  Fetching workflow logs (run {run_id})...")
-    proc = run_command(
-        ["gh", "run", "view", run_id, "--log"], cwd=repo_path, check=False
-    )
-    if proc.returncode == 0 and proc.stdout:
-        print(proc.stdout)
-    else:
+    # Let gh write the (potentially very large) log straight to our stdout
+    # instead of buffering it in memory
+    with _print_lock:
+        proc = run_command(
+            ["gh", "run", "view", run_id, "--log"],
+            cwd=repo_path,
+            check=False,
+            capture_output=False,
+        )
+    if proc.returncode != 0:
         print_warning("  Failed to retrieve workflow logs")
 
 
-def check_workflow_completed(repo_path: Path, tag: str) -> int:
-    run, ok = get_release_run(repo_path, tag)
-    if not ok:
-        proc_release = run_command(
-            ["gh", "release", "view", tag], cwd=repo_path, check=False
-        )
-        if proc_release.returncode == 0:
-            return 0
-        return 1
+def check_release_published(repo_path: Path, tag: str) -> int:
+    proc_release = run_command(
+        ["gh", "release", "view", tag], cwd=repo_path, check=False
+    )
+    if proc_release.returncode == 0:
+        return 0
+    return 1
 
-    if not run:
-        proc_release = run_command(
-            ["gh", "release", "view", tag], cwd=repo_path, check=False
-        )
-        if proc_release.returncode == 0:
-            return 0
-        return 1
 
+def check_run_completed(run: dict) -> int:
     status = run.get("status")
     conclusion = run.get("conclusion")
 
@@ -562,6 +743,7 @@ def check_workflow_completed(repo_path: Path, tag: str) -> int:
 REGISTRY_WORKFLOW_ID = "188184531"
 MAX_WAIT = 1800  # 30 minutes
 POLL_INTERVAL = 30  # 30 seconds
+MAX_PARALLEL_REPOS = 8
 
 
 def process_repo(
@@ -593,93 +775,75 @@ def process_repo(
 
     print_info(f"Processing {repo}...")
 
-    files_updated = False
     is_nodetool = repo == "nodetool"
 
     pyproject_path = repo_path / "pyproject.toml"
     copilot_workflow = repo_path / ".github/workflows/copilot-setup-steps.yml"
-    dockerfiles = []
+    # Stat each well-known file once; the updaters below skip their own checks
+    pyproject_exists = pyproject_path.is_file()
+    copilot_exists = copilot_workflow.is_file()
+    # Files rewritten by this run; only these get staged
+    changed_paths: List[Optional[Path]] = []
 
     if args.update_versions and not is_nodetool:
-        if update_pyproject_version(pyproject_path, version):
-            files_updated = True
-
-        if update_nodetool_core_dependency(pyproject_path, version):
-            files_updated = True
-
-        if update_copilot_core_ref(copilot_workflow, version_tag):
-            files_updated = True
+        project_files: List[Optional[Path]] = []
+        if pyproject_exists:
+            project_files.append(
+                update_pyproject(pyproject_path, version, assume_exists=True)
+            )
+        if copilot_exists:
+            changed_paths.append(
+                update_copilot_core_ref(
+                    copilot_workflow, version_tag, assume_exists=True
+                )
+            )
 
-        dockerfiles = find_dockerfiles(repo_path)
+        dockerfiles, metadata_dirs = find_version_files(repo_path)
         for dockerfile in dockerfiles:
-            if update_git_package_refs(dockerfile, version_tag):
-                files_updated = True
-            if update_dockerfile_pypi_versions(dockerfile, version):
-                files_updated = True
+            project_files.append(update_dockerfile(dockerfile, version, version_tag))
+        changed_paths.extend(project_files)
 
-        metadata_dirs = find_metadata_dirs(repo_path)
-
-        if (repo_path / "pyproject.toml").exists() or metadata_dirs:
+        # The scan is slow and its output only depends on the project files,
+        # so rerun it only when they changed or no metadata exists yet.
+        if (pyproject_exists or metadata_dirs) and (
+            any(project_files) or not metadata_dirs
+        ):
             if run_package_scan(repo_path):
-                files_updated = True
+                if not metadata_dirs:
+                    # The scan may have created package_metadata for the first time
+                    _, metadata_dirs = find_version_files(
+                        repo_path, include_untracked=True
+                    )
+                changed_paths.extend(
+                    changed_metadata_files(repo_path, metadata_dirs)
+                )
+        elif metadata_dirs:
+            print_info("  Project files unchanged, skipping nodetool package scan")
 
     if args.update_versions and is_nodetool:
-        if update_package_json_version(repo_path / "web/package.json", version):
-            files_updated = True
-        if update_package_json_version(repo_path / "electron/package.json", version):
-            files_updated = True
-        if update_package_json_version(repo_path / "mobile/package.json", version):
-            files_updated = True
-        if update_constants_version(repo_path / "web/src/config/constants.ts", version):
-            files_updated = True
-
-        if pyproject_path.exists() and not is_nodetool:
-            if generate_uv_lock(repo_path):
-                files_updated = True
+        for f in ["web/package.json", "electron/package.json", "mobile/package.json"]:
+            changed_paths.append(update_package_json_version(repo_path / f, version))
+        changed_paths.append(
+            update_constants_version(repo_path / "web/src/config/constants.ts", version)
+        )
 
-    if files_updated:
+        if pyproject_exists and not is_nodetool:
+            if generate_uv_lock(repo_path):
+                changed_paths.append(repo_path / "uv.lock")
+
+    paths_to_add = []
+    for path in changed_paths:
+        if path is None:
+            continue
+        try:
+            paths_to_add.append(str(path.relative_to(repo_path)))
+        except ValueError:
+            print_warning(f"  Skipping {path} (not relative to repo root)")
+
+    committed = False
+    if paths_to_add:
         print_info("  Staging version updates...")
-        if pyproject_path.exists():
-            run_command(["git", "add", "pyproject.toml"], cwd=repo_path)
-
-        lock_path = repo_path / "uv.lock"
-        if lock_path.exists():
-            run_command(["git", "add", "uv.lock"], cwd=repo_path)
-
-        metadata_dirs = find_metadata_dirs(repo_path)
-
-        for metadata_dir in metadata_dirs:
-            if metadata_dir.exists():
-                for f in metadata_dir.glob("*.json"):
-                    try:
-                        rel_path = f.relative_to(repo_path)
-                        run_command(["git", "add", str(rel_path)], cwd=repo_path)
-                    except ValueError:
-                        print_warning(f"  Skipping {f} (not relative to repo root)")
-
-        if is_nodetool:
-            for f in [
-                "web/package.json",
-                "electron/package.json",
-                "mobile/package.json",
-                "web/src/config/constants.ts",
-            ]:
-                if (repo_path / f).exists():
-                    run_command(["git", "add", f], cwd=repo_path)
-        if copilot_workflow.exists():
-            run_command(
-                ["git", "add", str(copilot_workflow.relative_to(repo_path))],
-                cwd=repo_path,
-            )
-        for dockerfile in dockerfiles:
-            if dockerfile.exists():
-                try:
-                    rel_path = dockerfile.relative_to(repo_path)
-                    run_command(["git", "add", str(rel_path)], cwd=repo_path)
-                except ValueError:
-                    print_warning(
-                        f"  Skipping {dockerfile} (not relative to repo root)"
-                    )
+        run_command(["git", "add", "--"] + paths_to_add, cwd=repo_path)
 
         print_info("  Committing version updates...")
         proc = run_command(
@@ -689,23 +853,7 @@ def process_repo(
         )
         if proc.returncode == 0:
             print_info("  Committed version changes")
-            print_info("  Pushing commit to remote (main)...")
-            push_result = run_command(
-                ["git", "push", "-v", "origin", "refs/heads/main"], cwd=repo_path, check=False
-            )
-            if push_result.returncode == 0:
-                print_info("  Pushed commit")
-            else:
-                print_error(f"  Failed to push commit for {repo}")
-                print_error(
-                    f"  stdout: {push_result.stdout if push_result.stdout else '(empty)'}"
-                )
-                print_error(
-                    f"  stderr: {push_result.stderr if push_result.stderr else '(empty)'}"
-                )
-                # Print diagnostics again after failure
-                print_git_diagnostics(repo_path)
-                return
+            committed = True
         else:
             print_warning(
                 f"  No changes to commit (files may already be at version {version})"
@@ -719,14 +867,21 @@ def process_repo(
         cwd=repo_path,
     )
 
-    print_info(f"  Pushing tag {version_tag} to remote...")
+    # Push the version commit and the (force-updated) tag in one atomic
+    # round trip: either both land or neither does.
+    refspecs = [f"+refs/tags/{version_tag}"]
+    if committed:
+        refspecs.insert(0, "refs/heads/main")
+    print_info(f"  Pushing {' and '.join(refspecs)} to remote...")
     push_result = run_command(
-        ["git", "push", "-v", "-f", "origin", f"refs/tags/{version_tag}"], cwd=repo_path, check=False
+        ["git", "push", "-v", "--atomic", "origin"] + refspecs,
+        cwd=repo_path,
+        check=False,
     )
     if push_result.returncode == 0:
         print_info(f"  Successfully tagged and pushed {repo}")
     else:
-        print_error(f"  Failed to push tag for {repo}")
+        print_error(f"  Failed to push {repo}")
         print_error(
             f"  stdout: {push_result.stdout if push_result.stdout else '(empty)'}"
         )
@@ -737,47 +892,170 @@ def process_repo(
         print_git_diagnostics(repo_path)
 
 
-def wait_for_repos(repos_to_wait: List[str], version_tag: str, cwd: Path):
-    elapsed = 0
-    logged_failures = set()
+def process_repos_parallel(
+    repos: List[str],
+    repos_to_process: List[str],
+    version: str,
+    version_tag: str,
+    args,
+    cwd: Path,
+):
+    """Process independent repositories concurrently; exit if any of them raised."""
+    if not repos:
+        return
 
-    while elapsed < MAX_WAIT:
-        all_completed = True
-        any_failed = False
+    failed = []
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_REPOS, len(repos))) as pool:
+        futures = {
+            pool.submit(
+                process_repo, repo, repos_to_process, version, version_tag, args, cwd
+            ): repo
+            for repo in repos
+        }
+        for future in as_completed(futures):
+            repo = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print_error(f"Processing {repo} failed: {e}")
+                failed.append(repo)
+
+    if failed:
+        print_error(f"Failed to process: {', '.join(sorted(failed))}")
+        sys.exit(1)
 
-        for repo in repos_to_wait:
-            repo_path = cwd / repo
-            if not repo_path.is_dir():
-                continue
 
-            result = check_workflow_completed(repo_path, version_tag)
-
-            if result == 0:
-                print_info(f"  Release workflow completed for {repo}")
-            elif result == 2:
-                print_error(f"  Release workflow failed or cancelled for {repo}")
-                if repo not in logged_failures:
-                    print_workflow_logs(repo_path, version_tag)
-                    logged_failures.add(repo)
-                any_failed = True
-                all_completed = False
+def watch_release_run(repo: str, repo_path: Path, run: dict, timeout: float) -> int:
+    """
+    Block on `gh run watch` until a release run finishes.
+    Returns the same codes as check_run_completed.
+
+    `gh run watch` polls the REST API itself, so it is given POLL_INTERVAL to
+    keep the request rate of concurrent watchers bounded. Its progress output
+    is discarded; print_workflow_logs reports failures. gh also exits non-zero
+    on API or network errors, so a non-zero exit is checked against the run's
+    actual state and the watch is restarted while the run is still going.
+    """
+    if run.get("status") == "completed":
+        return check_run_completed(run)
+
+    cmd = [
+        "gh",
+        "run",
+        "watch",
+        str(run["databaseId"]),
+        "--exit-status",
+        "--compact",
+        "--interval",
+        str(POLL_INTERVAL),
+        "--repo",
+        f"{GITHUB_OWNER}/{repo}",
+    ]
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return 1
+        print_info(f"Running: {' '.join(cmd)} (cwd={repo_path})")
+        try:
+            proc = subprocess.run(
+                cmd,
+                cwd=repo_path,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=remaining,
+            )
+        except subprocess.TimeoutExpired:
+            return 1
+        if proc.returncode == 0:
+            return 0
+
+        current = view_release_run(repo, repo_path, run["databaseId"])
+        if current and current.get("status") == "completed":
+            return check_run_completed(current)
+
+        detail = f": {proc.stderr.strip()}" if proc.stderr else ""
+        print_warning(
+            f"  gh run watch exited with {proc.returncode} for {repo}{detail}; "
+            "run not finished, watching again"
+        )
+        time.sleep(min(POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+
+
+def wait_for_repos(repos_to_wait: List[str], version_tag: str, cwd: Path):
+    start = time.monotonic()
+    pending = [repo for repo in repos_to_wait if (cwd / repo).is_dir()]
+    runs = {}
+    results = {}
+    # Release runs on the tagged commit that were triggered by another tag
+    rejected_ids = set()
+
+    # Poll only until every repo's release run for this tag exists (or the
+    # release is already published), then block on the runs themselves.
+    while pending:
+        batch = get_release_runs_batch(pending, version_tag, cwd, rejected_ids)
+        for repo in list(pending):
+            run = batch.get(repo)
+            if run and run.get("databaseId"):
+                # The batch query matches by commit; only accept runs that
+                # were triggered by this tag push
+                run = view_release_run(repo, cwd / repo, run["databaseId"])
+                if run and run.get("headBranch") == version_tag:
+                    runs[repo] = run
+                    pending.remove(repo)
+                    continue
+                if run:
+                    rejected_ids.add(run.get("databaseId"))
+            if check_release_published(cwd / repo, version_tag) == 0:
+                results[repo] = 0
+                pending.remove(repo)
             else:
                 print_warning(f"  Waiting for release workflow in {repo}...")
-                all_completed = False
 
-        if all_completed:
-            if any_failed:
-                print_error("Some release workflows failed or were cancelled")
+        elapsed = time.monotonic() - start
+        if pending:
+            if elapsed >= MAX_WAIT:
+                print_error("Timeout waiting for release workflows to complete")
                 sys.exit(1)
-            return
-
-        if elapsed < MAX_WAIT:
             time.sleep(POLL_INTERVAL)
-            elapsed += POLL_INTERVAL
-            print_info(f"Elapsed time: {elapsed}s / {MAX_WAIT}s")
+            print_info(f"Elapsed time: {int(elapsed) + POLL_INTERVAL}s / {MAX_WAIT}s")
+
+    if runs:
+        remaining = max(MAX_WAIT - (time.monotonic() - start), 0)
+        with ThreadPoolExecutor(max_workers=len(runs)) as pool:
+            futures = {
+                pool.submit(
+                    watch_release_run, repo, cwd / repo, run, remaining
+                ): repo
+                for repo, run in runs.items()
+            }
+            done, _ = wait(futures, timeout=remaining + POLL_INTERVAL)
+            for future in done:
+                results[futures[future]] = future.result()
+
+    any_failed = False
+    timed_out = False
+    for repo in repos_to_wait:
+        result = results.get(repo)
+        if result is None and repo not in runs:
+            continue
+        if result == 0:
+            print_info(f"  Release workflow completed for {repo}")
+        elif result == 2:
+            print_error(f"  Release workflow failed or cancelled for {repo}")
+            print_workflow_logs(cwd / repo, runs.get(repo))
+            any_failed = True
+        else:
+            print_warning(f"  Release workflow in {repo} still running")
+            timed_out = True
 
-    print_error("Timeout waiting for release workflows to complete")
-    sys.exit(1)
+    if any_failed:
+        print_error("Some release workflows failed or were cancelled")
+        sys.exit(1)
+    if timed_out:
+        print_error("Timeout waiting for release workflows to complete")
+        sys.exit(1)
 
 
 def main():
@@ -863,8 +1141,13 @@ def main():
 
     print_info("Step 1b: Creating and pushing tags for Python packages...")
     python_repos = [repo for repo in repos_to_process if repo != "nodetool"]
-    for repo in python_repos:
-        process_repo(repo, repos_to_process, version, version_tag, args, cwd)
+    # nodetool-core was already handled sequentially in step 1a
+    parallel_repos = [
+        repo for repo in python_repos if args.repo or repo != "nodetool-core"
+    ]
+    process_repos_parallel(
+        parallel_repos, repos_to_process, version, version_tag, args, cwd
+    )
 
     print_info("Step 2: Waiting for release workflows to complete...")
     wait_for_repos(python_repos, version_tag, cwd)
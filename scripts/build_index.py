@@ -4,32 +4,87 @@ NodeTool Registry Package Index Builder
 Builds a PEP 503 compatible package index from GitHub releases
 """
 
+import io
 import os
+import re
 import json
-import requests
 import hashlib
 import argparse
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Pattern, Tuple
 from urllib.parse import urlparse
 
 from registry_utils import (
-    GitHubAPIClient,
+    CACHE_DIR,
     RegistryManager,
+    get_default_client,
     has_wheel_assets,
     parse_version,
     setup_logging,
 )
 
+# Release fetching is network-bound; bound concurrency to stay well clear of
+# GitHub's secondary rate limits.
+MAX_PACKAGE_WORKERS = 8
+MAX_ASSET_WORKERS = 8
+# Cap on GitHub requests in flight across all package and asset workers
+MAX_CONCURRENT_REQUESTS = 8
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+HASH_CHUNK_SIZE = 64 * 1024
+# Algorithms accepted for the PEP 658 data-dist-info-metadata hash. Each name
+# must mean hashlib.new(name), since that is how clients verify it. sha256 is
+# the default: pip ignores hash names outside md5/sha1/sha2 and so would not
+# verify blake2b at all.
+METADATA_HASH_ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+}
+# Shared by every pure-Python wheel row, so build it once.
+REQUIRES_PYTHON_ATTR = ' data-requires-python="&gt;=3.11"'
+# Per-package wheel counts read by generate_metadata.py
+WHEEL_COUNTS_FILE = "package_counts.json"
+
+
+def compile_wheel_filter(wheel_filter: str) -> Pattern[str]:
+    """Compile a registry wheel_filter; "a|b" keeps wheels containing either substring"""
+    return re.compile("|".join(re.escape(part) for part in wheel_filter.split("|")))
+
 
 class NodeToolRegistryBuilder:
     """Build package index for NodeTool packages"""
 
-    def __init__(self, github_token: Optional[str] = None):
-        self.github_client = GitHubAPIClient(github_token)
+    def __init__(
+        self,
+        github_token: Optional[str] = None,
+        metadata_hash_algo: str = "sha256",
+        use_graphql: bool = False,
+    ):
+        self.metadata_hash_algo = metadata_hash_algo
+        # GraphQL needs a token and can't be revalidated with ETags, so the
+        # REST path (free 304s for unchanged repos) stays the default
+        self.use_graphql = use_graphql and bool(github_token)
+        self.github_client = get_default_client(github_token)
         self.registry_manager = RegistryManager()
 
+        # Sidecar hashes are reused across builds. Re-uploading an asset to a
+        # force-moved tag keeps its URL, so the key includes updated_at and size.
+        self.sidecar_cache_path = CACHE_DIR / f"sidecar_hashes_{metadata_hash_algo}.json"
+        try:
+            with open(self.sidecar_cache_path, "r") as f:
+                self._sidecar_cache: Dict[str, str] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._sidecar_cache = {}
+        # Drop digests of another length (e.g. truncated blake2b from older builds)
+        hex_length = METADATA_HASH_ALGORITHMS[metadata_hash_algo]().digest_size * 2
+        self._sidecar_cache = {
+            key: digest
+            for key, digest in self._sidecar_cache.items()
+            if len(digest) == hex_length
+        }
+
         # Load packages from registry instead of hardcoding
         self._load_packages()
 
@@ -39,6 +94,7 @@ class NodeToolRegistryBuilder:
             packages = self.registry_manager.get_all_packages()
             self.packages = {}
             self.package_filters = {}
+            self.wheel_filter_patterns = {}
 
             for package in packages:
                 repo_id = package.get("repo_id", "")
@@ -50,6 +106,9 @@ class NodeToolRegistryBuilder:
                     wheel_filter = package.get("wheel_filter")
                     if wheel_filter:
                         self.package_filters[package_name] = wheel_filter
+                        self.wheel_filter_patterns[package_name] = compile_wheel_filter(
+                            wheel_filter
+                        )
 
             print(f"📋 Loaded {len(self.packages)} packages from registry")
 
@@ -58,184 +117,221 @@ class NodeToolRegistryBuilder:
             # Fallback to empty dict
             self.packages = {}
             self.package_filters = {}
-
-    def get_wheel_metadata(self, asset_url: str, asset_name: str) -> Dict:
+            self.wheel_filter_patterns = {}
+
+    def _save_sidecar_cache(self):
+        """Persist sidecar hashes for the next build"""
+        self.sidecar_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.sidecar_cache_path, "w") as f:
+            json.dump(self._sidecar_cache, f, indent=2, sort_keys=True)
+
+    def _hash_sidecar(self, metadata_url: str) -> Optional[str]:
+        """Download a sidecar and return its hex digest, hashing chunks as they stream in"""
+        with _request_slots, self.github_client.session.get(
+            metadata_url, stream=True, timeout=30
+        ) as response:
+            if not response.ok:
+                return None
+            digest = METADATA_HASH_ALGORITHMS[self.metadata_hash_algo]()
+            size = 0
+            for chunk in response.iter_content(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+            return digest.hexdigest() if size else None
+
+    def get_wheel_metadata(self, asset: Dict, sidecars: Dict[str, Dict]) -> Dict:
         """Get wheel metadata and discover PEP 658 metadata availability.
 
+        Size and upload time come straight from the release asset. `sidecars`
+        maps asset names to the release's `*.whl.metadata` assets; the sidecar
+        is only downloaded (to hash it) when one was published for this wheel.
+
         Returns a dict containing:
           - url, filename, size, upload_time
           - metadata_available: bool
-          - metadata_sha256: Optional[str] (hex digest without "sha256=")
+          - metadata_hash_algo: str (e.g. "sha256")
+          - metadata_hash: Optional[str] (hex digest without the "<algo>=" prefix)
         """
-        try:
-            # Get wheel content length without downloading
-            response = requests.head(asset_url, headers=self.github_client.headers)
-            size = int(response.headers.get("content-length", 0))
-
-            metadata_available = False
-            metadata_sha256 = None
-
-            # Check for PEP 658 sidecar metadata at <wheel_url>.metadata
-            try:
-                metadata_url = f"{asset_url}.metadata"
-                meta_head = requests.head(
-                    metadata_url, headers=self.github_client.headers
-                )
-                if meta_head.status_code == 200:
-                    meta_get = requests.get(
-                        metadata_url, headers=self.github_client.headers
-                    )
-                    if meta_get.ok and meta_get.content:
-                        metadata_sha256 = hashlib.sha256(meta_get.content).hexdigest()
-                        metadata_available = True
-            except Exception:
-                # If we can't retrieve sidecar metadata, simply don't advertise it
-                metadata_available = False
-
-            return {
-                "url": asset_url,
-                "filename": asset_name,
-                "size": size,
-                "upload_time": response.headers.get("last-modified", ""),
-                "metadata_available": metadata_available,
-                "metadata_sha256": metadata_sha256,
-            }
-        except Exception as e:
-            print(f"⚠️  Warning: Could not get metadata for {asset_name}: {e}")
-            return {
-                "url": asset_url,
-                "filename": asset_name,
-                "size": 0,
-                "upload_time": "",
-                "metadata_available": False,
-                "metadata_sha256": None,
-            }
+        asset_name = asset["name"]
+        metadata_hash = None
+
+        # Check for PEP 658 sidecar metadata at <wheel_url>.metadata
+        sidecar = sidecars.get(f"{asset_name}.metadata")
+        if sidecar:
+            metadata_url = sidecar["browser_download_url"]
+            cache_key = f'{metadata_url}|{sidecar.get("updated_at", "")}|{sidecar.get("size", "")}'
+            metadata_hash = self._sidecar_cache.get(cache_key)
+            if metadata_hash is None:
+                try:
+                    metadata_hash = self._hash_sidecar(metadata_url)
+                except Exception as e:
+                    # If we can't retrieve sidecar metadata, simply don't advertise it
+                    print(f"⚠️  Warning: Could not get metadata for {asset_name}: {e}")
+                if metadata_hash:
+                    self._sidecar_cache[cache_key] = metadata_hash
+        metadata_available = metadata_hash is not None
+
+        return {
+            "url": asset["browser_download_url"],
+            "filename": asset_name,
+            "size": asset.get("size", 0),
+            "upload_time": asset.get("updated_at", ""),
+            "metadata_available": metadata_available,
+            "metadata_hash_algo": self.metadata_hash_algo,
+            "metadata_hash": metadata_hash,
+        }
+
+    def _wheel_link(self, wheel: Dict) -> str:
+        """Render the anchor row for a single wheel"""
+        attrs = f'href="{wheel["url"]}"'
+
+        if wheel.get("size"):
+            attrs += f' data-size="{wheel["size"]}"'
+
+        # Add Python version requirement
+        if "py3" in wheel["filename"]:
+            attrs += REQUIRES_PYTHON_ATTR
+
+        # Include PEP 658 attribute only if we actually found sidecar metadata
+        if wheel.get("metadata_available") and wheel.get("metadata_hash"):
+            attrs += f' data-dist-info-metadata="{wheel["metadata_hash_algo"]}={wheel["metadata_hash"]}"'
+
+        return f'    <a {attrs}>{wheel["filename"]}</a><br>\n'
 
     def generate_package_page(
-        self, package_name: str, repo: str, output_dir: Path, wheel_filter: Optional[str] = None
+        self, package_name: str, repo: str, output_dir: Path, wheel_filter: Optional[Pattern[str]] = None
     ):
         """Generate PEP 503 package page"""
-        releases = self.github_client.get_releases(repo)
-
-        # Filter and sort releases
-        valid_releases = []
-        for release in releases:
-            if release.get("draft") or release.get("prerelease"):
-                continue
-
-            v = parse_version(release["tag_name"])
-            if v:
-                valid_releases.append((v, release))
+        with _request_slots:
+            if self.use_graphql:
+                releases = self.github_client.get_releases_graphql(repo)
+            else:
+                releases = self.github_client.get_releases(repo)
+
+        # Filter and sort releases; drafts and prereleases are skipped before parsing
+        valid_releases = [
+            (v, release)
+            for release in releases
+            if not (release.get("draft") or release.get("prerelease"))
+            and (v := parse_version(release["tag_name"]))
+        ]
 
         # Sort by version (newest first)
         valid_releases.sort(key=lambda x: x[0], reverse=True)
 
         # Collect wheel assets
-        wheels = []
+        wheel_assets = []
         for v, release in valid_releases:
-            for asset in release.get("assets", []):
-                if asset["name"].endswith(".whl"):
-                    # Apply wheel filter if specified
-                    if wheel_filter and wheel_filter not in asset["name"]:
-                        continue
-                    metadata = self.get_wheel_metadata(
-                        asset["browser_download_url"], asset["name"]
-                    )
-                    metadata["version"] = str(v)
-                    metadata["release_date"] = release["published_at"]
-                    wheels.append(metadata)
-
-        # Generate HTML
-        html_lines = [
-            "<!DOCTYPE html>",
-            "<html>",
-            "<head>",
-            f"  <title>Links for {package_name}</title>",
-            '  <meta name="pypi:repository-version" content="1.0">',
-            '  <meta name="api-version" content="2">',
-            "</head>",
-            "<body>",
-            f"  <h1>Links for {package_name}</h1>",
-        ]
-
-        # Add wheel links
-        for wheel in wheels:
-            attrs = [f'href="{wheel["url"]}"']
-
-            if wheel.get("size"):
-                attrs.append(f'data-size="{wheel["size"]}"')
+            assets = release.get("assets", ())
+            # Apply wheel filter if specified
+            whl_assets = [
+                asset
+                for asset in assets
+                if asset["name"].endswith(".whl")
+                and (not wheel_filter or wheel_filter.search(asset["name"]))
+            ]
+            if not whl_assets:
+                continue
+            sidecars = {
+                asset["name"]: asset
+                for asset in assets
+                if asset["name"].endswith(".whl.metadata")
+            }
+            wheel_assets.extend((v, release, asset, sidecars) for asset in whl_assets)
 
-            # Add Python version requirement
-            if "py3" in wheel["filename"]:
-                attrs.append('data-requires-python="&gt;=3.11"')
+        # Fetch wheel metadata concurrently; map() keeps the release order
+        def fetch_metadata(item):
+            v, release, asset, sidecars = item
+            metadata = self.get_wheel_metadata(asset, sidecars)
+            metadata["version"] = str(v)
+            metadata["release_date"] = release["published_at"]
+            return metadata
 
-            # Include PEP 658 attribute only if we actually found sidecar metadata
-            if wheel.get("metadata_available") and wheel.get("metadata_sha256"):
-                attrs.append(
-                    f'data-dist-info-metadata="sha256={wheel["metadata_sha256"]}"'
-                )
+        with ThreadPoolExecutor(max_workers=MAX_ASSET_WORKERS) as executor:
+            wheels = list(executor.map(fetch_metadata, wheel_assets))
 
-            link_html = f'    <a {" ".join(attrs)}>{wheel["filename"]}</a><br>'
-            html_lines.append(link_html)
+        # Generate HTML
+        buf = io.StringIO()
+        buf.write(
+            "<!DOCTYPE html>\n"
+            "<html>\n"
+            "<head>\n"
+            f"  <title>Links for {package_name}</title>\n"
+            '  <meta name="pypi:repository-version" content="1.0">\n'
+            '  <meta name="api-version" content="2">\n'
+            "</head>\n"
+            "<body>\n"
+            f"  <h1>Links for {package_name}</h1>\n"
+        )
 
-        html_lines.extend(["</body>", "</html>"])
+        # Add wheel links
+        buf.write("".join([self._wheel_link(wheel) for wheel in wheels]))
+        buf.write("</body>\n</html>\n")
 
         # Write package page
         package_dir = output_dir / package_name
         package_dir.mkdir(parents=True, exist_ok=True)
-
-        with open(package_dir / "index.html", "w", encoding="utf-8") as f:
-            f.write("\n".join(html_lines))
+        # Encode up front: one write() and no newline translation on Windows
+        (package_dir / "index.html").write_bytes(buf.getvalue().encode("utf-8"))
 
         print(f"✅ Generated {package_name} index ({len(wheels)} wheels)")
         return len(wheels)
 
     def generate_root_index(self, output_dir: Path, package_counts: Dict[str, int]):
         """Generate root index page"""
-        html_lines = [
-            "<!DOCTYPE html>",
-            "<html>",
-            "<head>",
-            "  <title>NodeTool Package Index</title>",
-            '  <meta name="pypi:repository-version" content="1.0">',
-            '  <meta name="api-version" content="2">',
-            "</head>",
-            "<body>",
-            "  <h1>NodeTool Package Index</h1>",
-            "  <p>Simple package index for NodeTool packages hosted on GitHub</p>",
-            "  <hr>",
-        ]
+        buf = io.StringIO()
+        buf.write(
+            "<!DOCTYPE html>\n"
+            "<html>\n"
+            "<head>\n"
+            "  <title>NodeTool Package Index</title>\n"
+            '  <meta name="pypi:repository-version" content="1.0">\n'
+            '  <meta name="api-version" content="2">\n'
+            "</head>\n"
+            "<body>\n"
+            "  <h1>NodeTool Package Index</h1>\n"
+            "  <p>Simple package index for NodeTool packages hosted on GitHub</p>\n"
+            "  <hr>\n"
+        )
 
         # Add package links with counts
         total_wheels = 0
+        rows = []
         for package_name in sorted(self.packages.keys()):
             count = package_counts.get(package_name, 0)
             total_wheels += count
-            html_lines.append(
-                f'  <a href="{package_name}/">{package_name}</a> ({count} wheels)<br>'
+            rows.append(
+                f'  <a href="{package_name}/">{package_name}</a> ({count} wheels)<br>\n'
             )
-
-        html_lines.extend(
-            [
-                "  <hr>",
-                f"  <p><small>Total: {len(self.packages)} packages, {total_wheels} wheels</small></p>",
-                f'  <p><small>Last updated: {time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())}</small></p>',
-                "</body>",
-                "</html>",
-            ]
+        buf.write("".join(rows))
+
+        buf.write(
+            "  <hr>\n"
+            f"  <p><small>Total: {len(self.packages)} packages, {total_wheels} wheels</small></p>\n"
+            f'  <p><small>Last updated: {time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())}</small></p>\n'
+            "</body>\n"
+            "</html>\n"
         )
 
-        with open(output_dir / "index.html", "w", encoding="utf-8") as f:
-            f.write("\n".join(html_lines))
+        (output_dir / "index.html").write_bytes(buf.getvalue().encode("utf-8"))
 
         print(
             f"✅ Generated root index ({len(self.packages)} packages, {total_wheels} wheels)"
         )
 
     def build_index(
-        self, output_dir: str, force_rebuild: bool = False, package_filter: str = None
+        self,
+        output_dir: str,
+        force_rebuild: bool = False,
+        package_filter: str = None,
+        counts_file: Optional[str] = None,
     ):
-        """Build complete package index"""
+        """Build complete package index.
+
+        Wheel counts go to `counts_file`; by default that is next to the index
+        when it is a `simple/` directory (where generate_metadata.py looks for
+        it) and inside the output directory otherwise.
+        """
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
@@ -256,6 +352,10 @@ class NodeToolRegistryBuilder:
 
         package_counts = {}
 
+        if force_rebuild:
+            # Re-hash every sidecar instead of trusting earlier builds
+            self._sidecar_cache = {}
+
         # Load existing counts for incremental builds
         if not force_rebuild and package_filter:
             try:
@@ -267,17 +367,29 @@ class NodeToolRegistryBuilder:
             except (FileNotFoundError, json.JSONDecodeError):
                 pass
 
-        # Generate package pages
-        for package_name, repo in packages_to_build.items():
-            wheel_filter = self.package_filters.get(package_name)
-            filter_info = f" [filter: {wheel_filter}]" if wheel_filter else ""
-            print(f"\n📦 Processing {package_name} ({repo}){filter_info}")
-            try:
-                count = self.generate_package_page(package_name, repo, output_path, wheel_filter)
-                package_counts[package_name] = count
-            except Exception as e:
-                print(f"❌ Failed to process {package_name}: {e}")
-                package_counts[package_name] = 0
+        # Generate package pages concurrently
+        with ThreadPoolExecutor(max_workers=MAX_PACKAGE_WORKERS) as executor:
+            futures = {}
+            for package_name, repo in packages_to_build.items():
+                wheel_filter = self.package_filters.get(package_name)
+                filter_info = f" [filter: {wheel_filter}]" if wheel_filter else ""
+                print(f"\n📦 Processing {package_name} ({repo}){filter_info}")
+                future = executor.submit(
+                    self.generate_package_page,
+                    package_name,
+                    repo,
+                    output_path,
+                    self.wheel_filter_patterns.get(package_name),
+                )
+                futures[future] = package_name
+
+            for future in as_completed(futures):
+                package_name = futures[future]
+                try:
+                    package_counts[package_name] = future.result()
+                except Exception as e:
+                    print(f"❌ Failed to process {package_name}: {e}")
+                    package_counts[package_name] = 0
 
         # Generate root index (always, to include all packages)
         print(f"\n📋 Generating root index")
@@ -287,6 +399,17 @@ class NodeToolRegistryBuilder:
                 package_counts[package_name] = 0
 
         self.generate_root_index(output_path, package_counts)
+        self._save_sidecar_cache()
+
+        # Record wheel counts so generate_metadata.py need not re-parse the pages
+        if counts_file:
+            counts_path = Path(counts_file)
+        elif output_path.name == "simple":
+            counts_path = output_path.parent / WHEEL_COUNTS_FILE
+        else:
+            counts_path = output_path / WHEEL_COUNTS_FILE
+        with open(counts_path, "w") as f:
+            json.dump(package_counts, f, indent=2, sort_keys=True)
 
         print(f"\n🎉 Package index built successfully!")
         print(f"📍 Location: {output_path.absolute()}")
@@ -301,12 +424,28 @@ def main():
         "--output-dir", default="dist", help="Output directory for index"
     )
     parser.add_argument("--github-token", help="GitHub token for API access")
+    parser.add_argument(
+        "--counts-file",
+        help=f"Where to write per-package wheel counts (default: ../{WHEEL_COUNTS_FILE} "
+        f"for a 'simple' output dir, otherwise <output-dir>/{WHEEL_COUNTS_FILE})",
+    )
     parser.add_argument(
         "--force-rebuild", action="store_true", help="Force rebuild entire index"
     )
     parser.add_argument(
         "--package-filter", help="Only build index for specific package"
     )
+    parser.add_argument(
+        "--metadata-hash",
+        choices=sorted(METADATA_HASH_ALGORITHMS),
+        default="sha256",
+        help="Hash algorithm advertised for PEP 658 metadata (pip does not verify blake2b)",
+    )
+    parser.add_argument(
+        "--graphql",
+        action="store_true",
+        help="Fetch releases and assets through the GraphQL API (requires a token)",
+    )
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
 
     args = parser.parse_args()
@@ -320,9 +459,13 @@ def main():
     github_token = args.github_token or os.getenv("GITHUB_TOKEN")
     if not github_token:
         print("⚠️  Warning: No GitHub token provided, API rate limits may apply")
+        if args.graphql:
+            print("⚠️  Warning: --graphql requires a GitHub token, using the REST API")
 
-    builder = NodeToolRegistryBuilder(github_token)
-    builder.build_index(args.output_dir, args.force_rebuild, args.package_filter)
+    builder = NodeToolRegistryBuilder(github_token, args.metadata_hash, args.graphql)
+    builder.build_index(
+        args.output_dir, args.force_rebuild, args.package_filter, args.counts_file
+    )
 
 
 if __name__ == "__main__":
@@ -32,18 +32,20 @@ def generate_packages_manifest(output_dir: Path):
     simple_dir = output_dir / 'simple'
     packages = []
     
+    # Wheel counts are written by build_index.py alongside simple/
+    try:
+        with open(output_dir / 'package_counts.json', 'r') as f:
+            wheel_counts = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        wheel_counts = {}
+    
     if simple_dir.exists():
         for package_dir in simple_dir.iterdir():
             if package_dir.is_dir() and (package_dir / 'index.html').exists():
-                # Count wheels
-                with open(package_dir / 'index.html', 'r') as f:
-                    content = f.read()
-                    wheel_count = content.count('.whl')
-                
                 packages.append({
                     "name": package_dir.name,
                     "url": f"https://nodetool-ai.github.io/nodetool-registry/simple/{package_dir.name}/",
-                    "wheel_count": wheel_count,
+                    "wheel_count": wheel_counts.get(package_dir.name, 0),
                     "last_updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
                 })
     
@@ -5,17 +5,27 @@ Poll external repositories for new releases and update the registry.
 This script checks for new releases in external (third-party) repositories
 and updates the package index accordingly.
 """
-import json
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
-from registry_utils import GitHubAPIClient, RegistryManager, has_wheel_assets, setup_logging
+from registry_utils import (
+    GitHubAPIClient,
+    RegistryManager,
+    get_default_client,
+    has_wheel_assets,
+    setup_logging,
+)
 
 setup_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Concurrent GitHub API calls; small enough to stay under secondary rate limits
+MAX_DISCOVERY_WORKERS = 8
+MAX_POLL_WORKERS = 10
+
 def update_package_info(registry: Dict, repo_id: str, release: Dict) -> bool:
     """Update package information with latest release data"""
     updated = False
@@ -71,44 +81,62 @@ def discover_new_packages(github_client: GitHubAPIClient) -> List[str]:
         # Search for repositories with "nodetool-" prefix that aren't from nodetool-ai
         repos = github_client.search_repositories("nodetool- in:name -user:nodetool-ai")
         
-        for repo in repos:
-            repo_name = repo["name"]
-            repo_full_name = repo["full_name"]
-            
-            # Check if it looks like a nodetool package
-            if repo_name.startswith("nodetool-") and not repo["private"]:
-                # Check if it has releases with wheels
-                latest_release = github_client.get_latest_release(repo_full_name)
+        candidates = [
+            repo["full_name"]
+            for repo in repos
+            if repo["name"].startswith("nodetool-") and not repo["private"]
+        ]
+
+        # Check candidates for releases with wheels concurrently
+        with_wheels = set()
+        with ThreadPoolExecutor(max_workers=MAX_DISCOVERY_WORKERS) as executor:
+            futures = {
+                executor.submit(github_client.get_latest_release, repo_full_name): repo_full_name
+                for repo_full_name in candidates
+            }
+            for future in as_completed(futures):
+                latest_release = future.result()
                 if latest_release and has_wheel_assets(latest_release):
-                    logger.info(f"Discovered new nodetool package: {repo_full_name}")
-                    discovered.append(repo_full_name)
+                    with_wheels.add(futures[future])
+
+        # Keep search order so registry updates are deterministic
+        for repo_full_name in candidates:
+            if repo_full_name in with_wheels:
+                logger.info(f"Discovered new nodetool package: {repo_full_name}")
+                discovered.append(repo_full_name)
         
     except Exception as e:
         logger.error(f"Error during package discovery: {e}")
     
     return discovered
 
+def fetch_latest_releases(
+    github_client: GitHubAPIClient, repo_ids: List[str]
+) -> Dict[str, Optional[Dict]]:
+    """Fetch the latest release of each repository concurrently"""
+    with ThreadPoolExecutor(max_workers=MAX_POLL_WORKERS) as executor:
+        return dict(zip(repo_ids, executor.map(github_client.get_latest_release, repo_ids)))
+
 def main():
     """Main polling function"""
     logger.info("Starting external package polling...")
     
     # Initialize managers and clients
     registry_manager = RegistryManager()
-    github_client = GitHubAPIClient()
+    github_client = get_default_client()
     
     # Load current registry
     registry = registry_manager.load_registry()
-    original_registry = json.dumps(registry, sort_keys=True)
+    original_digest = registry_manager.digest(registry)
     
     # Get existing external repos
     external_repos = registry_manager.get_external_repos()
     logger.info(f"Found {len(external_repos)} external repositories in registry")
     
     # Check for updates to existing external repos
-    for repo_id in external_repos:
-        logger.info(f"Checking {repo_id} for updates...")
-        latest_release = github_client.get_latest_release(repo_id)
-        
+    logger.info(f"Checking {len(external_repos)} external repositories for updates...")
+    latest_releases = fetch_latest_releases(github_client, sorted(external_repos))
+    for repo_id, latest_release in latest_releases.items():
         if latest_release and has_wheel_assets(latest_release):
             update_package_info(registry, repo_id, latest_release)
         elif latest_release:
@@ -121,17 +149,15 @@ def main():
         logger.info("Discovering new nodetool packages...")
         discovered_repos = discover_new_packages(github_client)
         
-        for repo_id in discovered_repos:
-            if repo_id not in external_repos:
-                latest_release = github_client.get_latest_release(repo_id)
-                if latest_release and has_wheel_assets(latest_release):
-                    new_package = create_package_entry(repo_id, latest_release)
-                    registry["packages"].append(new_package)
-                    logger.info(f"Added new external package: {repo_id}")
+        new_repos = [repo_id for repo_id in discovered_repos if repo_id not in external_repos]
+        for repo_id, latest_release in fetch_latest_releases(github_client, new_repos).items():
+            if latest_release and has_wheel_assets(latest_release):
+                new_package = create_package_entry(repo_id, latest_release)
+                registry["packages"].append(new_package)
+                logger.info(f"Added new external package: {repo_id}")
     
     # Check if anything changed
-    updated_registry = json.dumps(registry, sort_keys=True)
-    if original_registry != updated_registry:
+    if registry_manager.digest(registry) != original_digest:
         logger.info("Registry updated, saving changes...")
         registry_manager.save_registry(registry)
     else:
@@ -4,16 +4,47 @@ Shared utilities for NodeTool registry operations.
 Consolidates common functionality across build and polling scripts.
 """
 
+import hashlib
 import json
 import time
 import requests
 import logging
 import re
+import threading
+from functools import lru_cache
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Persistent HTTP cache shared by the build and polling scripts
+CACHE_DIR = Path(".cache")
+RELEASES_PER_PAGE = 100
+# Once less than this share of the window's budget is left, requests are paced
+# until reset (unauthenticated clients only get 60 calls an hour)
+RATE_LIMIT_RESERVE_FRACTION = 0.1
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+# Releases with their assets, newest first (the same order as the REST API)
+RELEASES_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    releases(first: 100, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId tagName isDraft isPrerelease publishedAt
+        releaseAssets(first: 100) {
+          pageInfo { hasNextPage }
+          nodes { name downloadUrl size updatedAt }
+        }
+      }
+    }
+  }
+}
+"""
+
 
 class Version:
     """Simple semantic version implementation without external dependencies"""
@@ -117,6 +148,44 @@ class Version:
         return not (self < other)
 
 
+class ETagCache:
+    """Persist GitHub response bodies with their ETags for conditional requests"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = cache_dir / "releases_etags.json"
+        self._lock = threading.Lock()
+        try:
+            with open(self.index_path, "r") as f:
+                self.entries: Dict[str, Dict] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """Headers to revalidate `key`, or none if nothing usable is cached"""
+        entry = self.entries.get(key)
+        if entry and Path(entry["payload_path"]).exists():
+            return {"If-None-Match": entry["etag"]}
+        return {}
+
+    def load(self, key: str):
+        with open(self.entries[key]["payload_path"], "r") as f:
+            return json.load(f)
+
+    def store(self, key: str, etag: Optional[str], payload):
+        if not etag:
+            return
+        file_name = re.sub(r"[^\w.-]", "_", key) + ".json"
+        payload_path = self.cache_dir / "payloads" / file_name
+        with self._lock:
+            payload_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(payload_path, "w") as f:
+                json.dump(payload, f)
+            self.entries[key] = {"etag": etag, "payload_path": str(payload_path)}
+            with open(self.index_path, "w") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+
+
 class GitHubAPIClient:
     """Centralized GitHub API client with rate limiting"""
 
@@ -131,62 +200,155 @@ class GitHubAPIClient:
             else {"Accept": "application/vnd.github.v3+json"}
         )
 
-        self.api_calls = 0
-        self.start_time = time.time()
-
-    def rate_limit_check(self):
-        """Check and handle GitHub API rate limits"""
-        self.api_calls += 1
-        if self.api_calls % 10 == 0:  # Check every 10 calls
-            elapsed = time.time() - self.start_time
-            if elapsed < 60 and self.api_calls > 50:  # Approaching rate limit
-                sleep_time = 60 - elapsed + 1
-                logger.info(f"Rate limiting: sleeping {sleep_time:.1f}s")
-                time.sleep(sleep_time)
-                self.start_time = time.time()
-                self.api_calls = 0
+        # Reuse connections (and TLS sessions) across all GitHub requests
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(
+                    total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]
+                ),
+            ),
+        )
+
+        # Unchanged resources come back as body-less 304s that don't count
+        # against the primary rate limit
+        self.etag_cache = ETagCache()
+
+        # Last (remaining, reset, limit) reported by GitHub, per rate limit resource
+        self.rate_limits: Dict[str, Tuple[int, int, int]] = {}
+        # The client is shared by worker threads
+        self._rate_limit_lock = threading.Lock()
+
+    def rate_limit_check(self, resource: str = "core"):
+        """Wait if the last response said the rate limit budget is (nearly) spent"""
+        with self._rate_limit_lock:
+            state = self.rate_limits.get(resource)
+        if state is None:
+            return
+        remaining, reset_time, limit = state
+        if remaining >= max(limit * RATE_LIMIT_RESERVE_FRACTION, 1):
+            return
+
+        window = reset_time - time.time()
+        if window <= 0:
+            return  # The budget has been reset since that response
+        if remaining <= 0:
+            sleep_time = window + 0.5
+        else:
+            # Spread the remaining calls evenly over the rest of the window
+            sleep_time = window / remaining
+        logger.info(
+            f"Rate limiting ({resource}, {remaining}/{limit} left): sleeping {sleep_time:.1f}s"
+        )
+        # Sleep outside the lock so other workers are not serialized behind it
+        time.sleep(sleep_time)
+
+    def update_rate_limit(self, response: requests.Response):
+        """Record the rate limit budget reported in a response's headers"""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset_time = response.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset_time is None:
+            return
+        limit = response.headers.get("X-RateLimit-Limit", remaining)
+        resource = response.headers.get("X-RateLimit-Resource", "core")
+        with self._rate_limit_lock:
+            self.rate_limits[resource] = (int(remaining), int(reset_time), int(limit))
 
     def get_releases(self, repo_id: str) -> List[Dict]:
-        """Get releases for a repository with rate limiting"""
-        self.rate_limit_check()
+        """Get all releases for a repository with rate limiting.
+
+        GitHub returns releases newest-first, so paging stops at the first
+        page that reaches a release already in the cache; releases older than
+        the fetched range are taken from the cached copy. Cached releases inside
+        the fetched range that GitHub no longer returns were deleted and are
+        dropped.
+        """
         url = f"https://api.github.com/repos/{repo_id}/releases"
-
+        params = {"per_page": RELEASES_PER_PAGE}
+        cache_key = f"releases:{repo_id}"
+        # Only the first page is revalidated; its ETag covers the whole list
+        headers = self.etag_cache.conditional_headers(cache_key)
+        cached = self.etag_cache.load(cache_key) if headers else []
+        known_ids = {release.get("id") for release in cached}
+
+        releases = []
+        etag = None
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
-
-            # Check rate limit headers
-            remaining = response.headers.get("X-RateLimit-Remaining")
-            if remaining and int(remaining) < 10:
-                reset_time = int(response.headers.get("X-RateLimit-Reset", 0))
-                sleep_time = max(reset_time - time.time() + 1, 0)
-                if sleep_time > 0:
-                    logger.info(f"Rate limit protection: sleeping {sleep_time:.1f}s")
-                    time.sleep(sleep_time)
-
-            if response.status_code == 404:
-                logger.info(f"No releases found for {repo_id}")
-                return []
-            elif response.status_code != 200:
-                logger.warning(
-                    f"Failed to fetch releases for {repo_id}: {response.status_code}"
+            while url:
+                self.rate_limit_check()
+                response = self.session.get(
+                    url, params=params, headers=headers, timeout=30
                 )
-                return []
-
-            releases = response.json()
-            logger.info(f"Found {len(releases)} releases for {repo_id}")
-            return releases
+                self.update_rate_limit(response)
+
+                if response.status_code == 304:
+                    logger.info(f"Releases for {repo_id} unchanged ({len(cached)} cached)")
+                    return cached
+                elif response.status_code == 404:
+                    logger.info(f"No releases found for {repo_id}")
+                    return []
+                elif response.status_code != 200:
+                    logger.warning(
+                        f"Failed to fetch releases for {repo_id}: {response.status_code}"
+                    )
+                    return []
+
+                page = response.json()
+                if etag is None:
+                    etag = response.headers.get("ETag")
+                releases.extend(page)
+
+                # The next link already carries the query string
+                url = response.links.get("next", {}).get("url")
+                if url and any(release.get("id") in known_ids for release in page):
+                    break
+                params = None
+                headers = {}
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching releases for {repo_id}: {e}")
             return []
 
+        if url:
+            # Stopped early: splice in the cached releases older than the last
+            # one fetched. Tags re-created under a new id are taken from the
+            # fetched copy only.
+            fetched_ids = {release.get("id") for release in releases}
+            fetched_tags = {release.get("tag_name") for release in releases}
+            last_known = next(
+                release["id"]
+                for release in reversed(releases)
+                if release.get("id") in known_ids
+            )
+            cached_ids = [release.get("id") for release in cached]
+            releases.extend(
+                release
+                for release in cached[cached_ids.index(last_known) + 1 :]
+                if release.get("id") not in fetched_ids
+                and release.get("tag_name") not in fetched_tags
+            )
+        self.etag_cache.store(cache_key, etag, releases)
+        logger.info(f"Found {len(releases)} releases for {repo_id}")
+        return releases
+
     def get_latest_release(self, repo_id: str) -> Optional[Dict]:
         """Get the latest release for a repository"""
         try:
             url = f"https://api.github.com/repos/{repo_id}/releases/latest"
-            response = requests.get(url, headers=self.headers, timeout=30)
+            cache_key = f"latest:{repo_id}"
+            self.rate_limit_check()
+            response = self.session.get(
+                url, headers=self.etag_cache.conditional_headers(cache_key), timeout=30
+            )
+            self.update_rate_limit(response)
 
-            if response.status_code == 404:
+            if response.status_code == 304:
+                return self.etag_cache.load(cache_key)
+            elif response.status_code == 404:
                 logger.info(f"No releases found for {repo_id}")
                 return None
             elif response.status_code != 200:
@@ -195,21 +357,98 @@ class GitHubAPIClient:
                 )
                 return None
 
-            return response.json()
+            release = response.json()
+            self.etag_cache.store(cache_key, response.headers.get("ETag"), release)
+            return release
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching latest release for {repo_id}: {e}")
             return None
 
+    def graphql(self, query: str, variables: Optional[Dict] = None) -> Optional[Dict]:
+        """Run a GraphQL query and return its data, or None on any error"""
+        try:
+            self.rate_limit_check("graphql")
+            response = self.session.post(
+                GRAPHQL_URL,
+                json={"query": query, "variables": variables or {}},
+                timeout=30,
+            )
+            self.update_rate_limit(response)
+
+            if response.status_code != 200:
+                logger.warning(f"GraphQL query failed: {response.status_code}")
+                return None
+
+            result = response.json()
+            if result.get("errors"):
+                logger.warning(f"GraphQL query failed: {result['errors']}")
+                return None
+            return result.get("data")
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error during GraphQL query: {e}")
+            return None
+
+    def get_releases_graphql(self, repo_id: str) -> List[Dict]:
+        """Get all releases for a repository with one GraphQL query per 100 releases.
+
+        Releases are returned in the REST API's shape so callers can use either
+        source. Falls back to get_releases if the query fails or a release has
+        more assets than one query returns.
+        """
+        owner, name = repo_id.split("/", 1)
+        releases = []
+        cursor = None
+        while True:
+            data = self.graphql(
+                RELEASES_QUERY, {"owner": owner, "name": name, "cursor": cursor}
+            )
+            if data is None:
+                return self.get_releases(repo_id)
+            if data.get("repository") is None:
+                logger.info(f"No releases found for {repo_id}")
+                return []
+
+            page = data["repository"]["releases"]
+            for node in page["nodes"]:
+                if node["releaseAssets"]["pageInfo"]["hasNextPage"]:
+                    return self.get_releases(repo_id)
+                releases.append(
+                    {
+                        "id": node["databaseId"],
+                        "tag_name": node["tagName"],
+                        "draft": node["isDraft"],
+                        "prerelease": node["isPrerelease"],
+                        "published_at": node["publishedAt"],
+                        "assets": [
+                            {
+                                "name": asset["name"],
+                                "browser_download_url": asset["downloadUrl"],
+                                "size": asset["size"],
+                                "updated_at": asset["updatedAt"],
+                            }
+                            for asset in node["releaseAssets"]["nodes"]
+                        ],
+                    }
+                )
+
+            if not page["pageInfo"]["hasNextPage"]:
+                break
+            cursor = page["pageInfo"]["endCursor"]
+
+        logger.info(f"Found {len(releases)} releases for {repo_id}")
+        return releases
+
     def search_repositories(self, query: str, per_page: int = 50) -> List[Dict]:
         """Search repositories on GitHub"""
         try:
             search_url = "https://api.github.com/search/repositories"
             params = {"q": query, "sort": "updated", "per_page": per_page}
 
-            response = requests.get(
-                search_url, params=params, headers=self.headers, timeout=30
-            )
+            self.rate_limit_check("search")
+            response = self.session.get(search_url, params=params, timeout=30)
+            self.update_rate_limit(response)
             if response.status_code == 200:
                 data = response.json()
                 return data.get("items", [])
@@ -222,26 +461,56 @@ class GitHubAPIClient:
             return []
 
 
+_default_client: Optional[GitHubAPIClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client(token: Optional[str] = None) -> GitHubAPIClient:
+    """Return the process-wide GitHub client, so every caller shares one
+    connection pool, ETag cache and rate limit budget.
+
+    A new client replaces the shared one only if a different token is given.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None or (token and token != _default_client.token):
+            _default_client = GitHubAPIClient(token)
+        return _default_client
+
+
 class RegistryManager:
     """Manages the registry index.json file"""
 
     def __init__(self, registry_path: str = "index.json"):
         self.registry_path = Path(registry_path)
+        # Parsed index.json, kept in sync by save_registry
+        self._cached: Optional[Dict] = None
 
     def load_registry(self) -> Dict:
         """Load the registry index.json"""
+        if self._cached is not None:
+            return self._cached
+
         if not self.registry_path.exists():
             logger.error(f"Registry file not found: {self.registry_path}")
             raise FileNotFoundError(f"Registry file not found: {self.registry_path}")
 
         with open(self.registry_path, "r") as f:
-            return json.load(f)
+            self._cached = json.load(f)
+        return self._cached
 
     def save_registry(self, registry: Dict):
         """Save the registry index.json"""
         with open(self.registry_path, "w") as f:
             json.dump(registry, f, indent=2, sort_keys=True)
             f.write("\n")  # Add trailing newline
+        self._cached = registry
+
+    @staticmethod
+    def digest(registry: Dict) -> bytes:
+        """Digest of the registry's canonical (sorted, compact) JSON form"""
+        canonical = json.dumps(registry, sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
 
     def get_all_packages(self) -> List[Dict]:
         """Get all packages from registry"""
@@ -281,12 +550,13 @@ class RegistryManager:
 
 def has_wheel_assets(release: Dict) -> bool:
     """Check if a release has wheel (.whl) files"""
-    assets = release.get("assets", [])
-    return any(asset["name"].endswith(".whl") for asset in assets)
+    names = (asset["name"] for asset in release.get("assets", ()))
+    return any(name.endswith(".whl") for name in names)
 
 
+@lru_cache(maxsize=4096)
 def parse_version(tag_name: str) -> Optional[Version]:
-    """Parse version from git tag"""
+    """Parse version from git tag (cached; the same tags recur across packages and builds)"""
     try:
         # Remove 'v' prefix and any suffixes
         version_str = tag_name.lstrip("v").split("-")[0]